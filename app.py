@@ -1,917 +1,1209 @@
-import streamlit as st
-import requests
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-
-# =====================================
-# ⚙️ KONFIGURASI DASAR
-# =====================================
-st.set_page_config(page_title="Tactical Weather Ops — BMKG", layout="wide")
-
-# =====================================
-# 🌑 CSS — MILITARY STYLE + RADAR ANIMATION + FLIGHT PANEL + MET REPORT TABLE
-# =====================================
-
-# Menyimpan CSS styling untuk digunakan dalam file HTML QAM yang diunduh
-CSS_STYLES = """
-<style>
-/* Base theme */
-body {
-    background-color: #0b0c0c;
-    color: #cfd2c3;
-    font-family: "Consolas", "Roboto Mono", monospace;
-}
-/* Custom CSS for the MET REPORT TABLE (REVISED QAM FORMAT) */
-.met-report-table {
-    border: 1px solid #2b3c2b;
-    width: 100%;
-    margin-bottom: 20px;
-    background-color: #0f1111;
-    font-size: 0.95rem;
-    border-collapse: collapse;
-}
-.met-report-table th, .met-report-table td {
-    border: 1px solid #2b3c2b;
-    padding: 8px;
-    text-align: left;
-    vertical-align: top;
-}
-.met-report-table th {
-    background-color: #111;
-    color: #a9df52;
-    text-transform: uppercase;
-    width: 45%;
-    font-size: 0.85rem;
-}
-.met-report-table td {
-    color: #dfffe0;
-    width: 55%;
-    font-weight: bold;
-}
-.met-report-header {
-    text-align: center;
-    background-color: #0b0c0c;
-    color: #a9df52;
-    font-weight: bold;
-    font-size: 1.1rem;
-    padding: 10px 0;
-    border: 1px solid #2b3c2b;
-    border-bottom: none;
-}
-.met-report-subheader {
-    text-align: center;
-    background-color: #0b0c0c;
-    color: #cfd2c3;
-    font-weight: normal;
-    font-size: 0.8rem;
-    padding-bottom: 5px;
-}
-/* Print styles untuk memastikan warna tetap muncul saat cetak ke PDF */
-@media print {
-    body {
-        -webkit-print-color-adjust: exact;
-        color-adjust: exact;
-    }
-}
-
-/* Custom CSS for METAR Block (Dihapus dari skrip utama, namun CSS-nya tetap di sini) */
-.metar-block {
-    background-color: #1a2a1f;
-    border: 1px solid #3f4f3f;
-    padding: 15px;
-    border-radius: 8px;
-    margin-bottom: 20px;
-    font-family: 'Consolas', monospace;
-    font-size: 1.1rem;
-    color: #b6ff6d;
-    overflow-x: auto; /* Untuk METAR yang sangat panjang */
-}
-.metar-title {
-    color: #9adf4f;
-    font-size: 0.9rem;
-    text-transform: uppercase;
-    margin-bottom: 8px;
-}
-
-</style>
-"""
-
-# Menyuntikkan seluruh CSS ke Streamlit (termasuk yang tidak relevan untuk QAM, untuk tampilan dashboard)
-st.markdown(CSS_STYLES + """
-<style>
-/* CSS Streamlit Khusus */
-h1, h2, h3, h4 {
-    color: #a9df52;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-}
-section[data-testid="stSidebar"] {
-    background-color: #111;
-    color: #d0d3ca;
-}
-.stButton>button {
-    background-color: #1a2a1f;
-    color: #a9df52;
-    border: 1px solid #3f4f3f;
-    border-radius: 8px;
-    font-weight: bold;
-}
-/* ... (lanjutan CSS Streamlit) ... */
-.radar {
-  position: relative;
-  width: 160px;
-  height: 160px;
-  border-radius: 50%;
-  background: radial-gradient(circle, rgba(20,255,50,0.05) 20%, transparent 21%),
-              radial-gradient(circle, rgba(20,255,50,0.1) 10%, transparent 11%);
-  background-size: 20px 20px;
-  border: 2px solid #33ff55;
-  overflow: hidden;
-  margin: auto;
-  box-shadow: 0 0 20px #33ff55;
-}
-.radar:before {
-  content: "";
-  position: absolute;
-  top: 0; left: 0;
-  width: 50%; height: 2px;
-  background: linear-gradient(90deg, #33ff55, transparent);
-  transform-origin: 100% 50%;
-  animation: sweep 2.5s linear infinite;
-}
-@keyframes sweep {
-  from { transform: rotate(0deg); }
-  to { transform: rotate(360deg); }
-}
-hr, .stDivider {
-    border-top: 1px solid #2f3a2f;
-}
-.flight-card {
-    padding: 20px 24px;
-    background-color: #0f1111;
-    border: 1px solid #2b3c2b;
-    border-radius: 10px;
-    margin-bottom: 22px;
-}
-.flight-title {
-    font-size: 1.25rem;
-    font-weight: 700;
-    color: #9adf4f;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-    margin-bottom: 14px;
-}
-.metric-label {
-    font-size: 0.70rem;
-    text-transform: uppercase;
-    color: #9fa8a0;
-    letter-spacing: 0.6px;
-    margin-bottom: -6px;
-}
-.metric-value {
-    font-size: 1.9rem;
-    color: #b6ff6d;
-    margin-top: -6px;
-    font-weight: 700;
-}
-.small-note {
-    font-size: 0.78rem;
-    color: #9fa8a0;
-}
-.badge-green { color:#002b00; background:#b6ff6d; padding:4px 8px; border-radius:6px; font-weight:700; }
-.badge-yellow { color:#4a3b00; background:#ffd86b; padding:4px 8px; border-radius:6px; font-weight:700; }
-.badge-red { color:#2b0000; background:#ff6b6b; padding:4px 8px; border-radius:6px; font-weight:700; }
-.detail-value {
-    font-size: 1.2rem;
-    color: #dfffe0;
-    font-weight: bold;
-}
-
-/* -----------------------------
-   HUD wrapper specific styles
-   ----------------------------- */
-#f16hud-wrapper[data-mode='day'] #f16hud-container {
-    background: rgba(200, 255, 200, 0.12);
-    border-color: #7fbf7f;
-    box-shadow: 0 0 10px #7f7 inset;
-}
-#f16hud-wrapper[data-mode='night'] #f16hud-container {
-    background: rgba(0, 10, 0, 0.75);
-    border-color: #0f0;
-    box-shadow: 0 0 20px #0f0 inset;
-}
-#f16hud-container {
-    width: 100%;
-    background: rgba(0, 10, 0, 0.70);
-    border: 1px solid #1f3;
-    border-radius: 12px;
-    padding: 12px;
-    margin-top: 18px;
-    box-shadow: 0 0 15px #0f0 inset;
-}
-#f16hud-title {
-    color: #0f0;
-    font-size: 1.05rem;
-    text-align: center;
-    margin-bottom: 8px;
-    text-shadow: 0 0 6px #0f0;
-}
-#f16hud-svg {
-    width: 100%;
-    height: 220px;
-    display: block;
-    margin: auto;
-}
-.hud-glow {
-    stroke: #0f0;
-    stroke-width: 2;
-    fill: none;
-    filter: drop-shadow(0 0 6px #0f0);
-}
-#hud-wind-arrow {
-    stroke-width: 3;
-    stroke-linecap: round;
-    animation: windPulse 1.8s infinite ease-in-out;
-}
-@keyframes windPulse {
-    0%   { stroke-opacity: 0.4; }
-    50%  { stroke-opacity: 1.0; }
-    100% { stroke-opacity: 0.4; }
-}
-</style>
-""", unsafe_allow_html=True)
-
-# =====================================
-# 🟢 HUD + DAY/NIGHT LOGIC (ADDITIONAL BLOCKS)
-# =====================================
-
-# Helper: safe numeric getters to avoid formatting errors
-def safe_float(val, default=0.0):
-    try:
-        if val is None or (isinstance(val, float) and np.isnan(val)):
-            return default
-        return float(val)
-    except Exception:
-        return default
-
-def safe_int(val, default=0):
-    try:
-        if val is None or (isinstance(val, float) and np.isnan(val)):
-            return default
-        return int(round(float(val)))
-    except Exception:
-        return default
-
-# Day/night control in sidebar (hybrid Auto + manual override)
-with st.sidebar:
-    st.markdown("---")
-    st.subheader("🌗 Display Mode")
-    override_mode = st.selectbox("Override Mode", ["Auto", "Day", "Night"], index=0)
-
-def get_day_night_mode():
-    if override_mode == "Day": return "day"
-    if override_mode == "Night": return "night"
-    # AUTO MODE (local)
-    hour = datetime.now().hour
-    return "day" if 6 <= hour < 18 else "night"
-
-CURRENT_MODE = get_day_night_mode()
-
-# =====================================
-# 📡 KONFIGURASI API
-# =====================================
-API_BASE = "https://cuaca.bmkg.go.id/api/df/v1/forecast/adm"
-MS_TO_KT = 1.94384 # konversi ke knot
-METER_TO_SM = 0.000621371 # 1 meter = 0.000621371 statute miles (SM)
-
-# =====================================
-# 🧰 UTILITAS
-# =====================================
-@st.cache_data(ttl=300)
-def fetch_forecast(adm1: str):
-    params = {"adm1": adm1}
-    resp = requests.get(API_BASE, params=params, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
-
-def flatten_cuaca_entry(entry):
-    rows = []
-    lokasi = entry.get("lokasi", {})
-    for group in entry.get("cuaca", []):
-        for obs in group:
-            r = obs.copy()
-            r.update({
-                "adm1": lokasi.get("adm1"),
-                "adm2": lokasi.get("adm2"),
-                "provinsi": lokasi.get("provinsi"),
-                "kotkab": lokasi.get("kotkab"),
-                "lon": lokasi.get("lon"),
-                "lat": lokasi.get("lat"),
-            })
-            # safe datetime parse
-            r["utc_datetime_dt"] = pd.to_datetime(r.get("utc_datetime"), errors="coerce")
-            r["local_datetime_dt"] = pd.to_datetime(r.get("local_datetime"), errors="coerce")
-            rows.append(r)
-    df = pd.DataFrame(rows)
-    for c in ["t","tcc","tp","wd_deg","ws","hu","vs","ws_kt"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    return df
-
-def estimate_dewpoint(temp, rh):
-    if pd.isna(temp) or pd.isna(rh):
-        return None
-    # simple approximation
-    return temp - ((100 - rh) / 5)
-
-def ceiling_proxy_from_tcc(tcc_pct):
-    if pd.isna(tcc_pct):
-        return None, "Unknown"
-    tcc = float(tcc_pct)
-    if tcc < 1: # 0% - SKC
-        return 99999, "SKC (Clear)"
-    elif tcc < 25: # 1-25% - FEW
-        return 3500, "FEW (>3000 ft)"
-    elif tcc < 50: # 25-50% - SCT
-        return 2250, "SCT (1500-3000 ft)"
-    elif tcc < 75: # 50-75% - BKN
-        return 1250, "BKN (1000-1500 ft)"
-    else: # >75% - OVC
-        return 800, "OVC (<1000 ft)"
-
-def convert_vis_to_sm(visibility_m):
-    if pd.isna(visibility_m) or visibility_m is None:
-        return "—"
-    try:
-        vis_m = float(visibility_m)
-        vis_sm = vis_m * METER_TO_SM
-        if vis_sm < 1:
-            return f"{vis_sm:.1f} SM"
-        elif vis_sm < 5:
-            if (vis_sm * 2) % 2 == 0:
-                return f"{int(vis_sm)} SM"
-            else:
-                return f"{vis_sm:.1f} SM"
-        else:
-            return f"{int(round(vis_sm))} SM"
-    except ValueError:
-        return "—"
-
-def classify_ifr_vfr(visibility_m, ceiling_ft):
-    if visibility_m is None or pd.isna(visibility_m):
-        return "Unknown"
-    vis_sm = float(visibility_m) / 1609.34
-    if ceiling_ft is None:
-        if vis_sm >= 3: return "VFR"
-        elif vis_sm >= 1: return "MVFR"
-        else: return "IFR"
-    if vis_sm >= 5 and ceiling_ft > 3000: return "VFR"
-    if (3 <= vis_sm < 5) or (1000 < ceiling_ft <= 3000): return "MVFR"
-    if vis_sm < 3 or ceiling_ft <= 1000: return "IFR"
-    return "Unknown"
-
-def takeoff_landing_recommendation(ws_kt, vs_m, tp_mm):
-    rationale = []
-    takeoff = "Recommended"
-    landing = "Recommended"
-    if pd.notna(ws_kt) and float(ws_kt) >= 30:
-        takeoff = "Not Recommended"
-        landing = "Not Recommended"
-        rationale.append(f"High surface wind: {ws_kt:.1f} KT (>=30 KT limit)")
-    elif pd.notna(ws_kt) and float(ws_kt) >= 20:
-        rationale.append(f"Strong wind: {ws_kt:.1f} KT (>=20 KT advisory)")
-    if pd.notna(vs_m) and float(vs_m) < 1000:
-        landing = "Not Recommended"
-        rationale.append(f"Low visibility: {vs_m} m (<1000 m)")
-    if pd.notna(tp_mm) and float(tp_mm) >= 20:
-        takeoff = "Caution"
-        landing = "Caution"
-        rationale.append(f"Heavy accumulated rain: {tp_mm} mm (runway contamination possible)")
-    elif pd.notna(tp_mm) and float(tp_mm) > 5:
-        rationale.append(f"Moderate rainfall: {tp_mm} mm")
-    if not rationale:
-        rationale.append("Conditions within conservative operational limits.")
-    return takeoff, landing, rationale
-
-# Visual badge helper
-def badge_html(status):
-    if status == "VFR" or status == "Recommended" or status == "SKC (Clear)":
-        return "<span class='badge-green'>OK</span>"
-    if status == "MVFR" or status == "Caution":
-        return "<span class='badge-yellow'>CAUTION</span>"
-    if status == "IFR" or status == "Not Recommended":
-        return "<span class='badge-red'>NO-GO</span>"
-    return "<span class='badge-yellow'>UNKNOWN</span>"
-
-# =====================================
-# 🎚️ SIDEBAR (SEBELUM DATA DIMUAT)
-# =====================================
-with st.sidebar:
-    st.title("🛰️ Tactical Controls")
-    adm1 = st.text_input("Province Code (ADM1)", value="32")
-    # Tambahkan input ICAO Code
-    icao_code = st.text_input("ICAO Code (WXXX)", value="WXXX", max_chars=4)
-    st.markdown("<div class='radar'></div>", unsafe_allow_html=True)
-    st.markdown("<p style='text-align:center; color:#5f5;'>Scanning Weather...</p>", unsafe_allow_html=True)
-    st.button("🔄 Fetch Data")
-    st.markdown("---")
-    # Kontrol Tampilan
-    # show_metar (FCST Style Report) telah dihapus
-    show_map = st.checkbox("Show Map", value=True)
-    show_table = st.checkbox("Show Table (Raw Data)", value=False)
-    # Kontrol baru untuk MET Report
-    show_qam_report = st.checkbox("Show MET Report (QAM)", value=True) # Set to True as preferred
-    st.markdown("---")
-    st.caption("Data Source: BMKG API · Military Ops v2.2")
-
-# =====================================
-# 📡 LOAD DATA
-# =====================================
-st.title("Tactical Weather Operations Dashboard")
-st.markdown("*Source: BMKG Forecast API — Live Data*")
-
-# BLOK TRY DIMULAI DI SINI
-try:
-    with st.spinner("🛰️ Acquiring weather intelligence..."):
-        raw = fetch_forecast(adm1)
-        
-    entries = raw.get("data", [])
-    if not entries:
-        st.warning("No forecast data available.")
-        st.stop()
-
-    mapping = {}
-    for e in entries:
-        lok = e.get("lokasi", {})
-        label = lok.get("kotkab") or lok.get("adm2") or f"Location {len(mapping)+1}"
-        mapping[label] = {"entry": e}
-
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        loc_choice = st.selectbox("🎯 Select Location", options=list(mapping.keys()))
-    with col2:
-        st.metric("📍 Locations", len(mapping))
-
-    selected_entry = mapping[loc_choice]["entry"]
-    df = flatten_cuaca_entry(selected_entry)
-
-    if df.empty:
-        st.warning("No valid weather data found.")
-        st.stop()
-
-    # compute ws_kt if not already present
-    if "ws_kt" not in df.columns:
-        df["ws_kt"] = df["ws"] * MS_TO_KT
-    else:
-        df["ws_kt"] = pd.to_numeric(df["ws_kt"], errors="coerce")
-
-# =====================================
-# 🕓 SLIDER WAKTU
-# =====================================
-    # Find the correct datetime column and set range
-    if "local_datetime_dt" in df.columns and df["local_datetime_dt"].notna().any():
-        df = df.sort_values("local_datetime_dt")
-        min_dt = df["local_datetime_dt"].dropna().min().to_pydatetime()
-        max_dt = df["local_datetime_dt"].dropna().max().to_pydatetime()
-        use_col = "local_datetime_dt"
-    elif "utc_datetime_dt" in df.columns and df["utc_datetime_dt"].notna().any():
-        df = df.sort_values("utc_datetime_dt")
-        min_dt = df["utc_datetime_dt"].dropna().min().to_pydatetime()
-        max_dt = df["utc_datetime_dt"].dropna().max().to_pydatetime()
-        use_col = "utc_datetime_dt"
-    else:
-        min_dt = 0
-        max_dt = len(df)-1
-        use_col = None
-
-    # slider only when datetime exists
-    if use_col:
-        # Memindahkan slider ke Sidebar
-        with st.sidebar:
-            start_dt = st.slider(
-                "Time Range",
-                min_value=min_dt,
-                max_value=max_dt,
-                # Set default range to cover only the first forecast time
-                value=(min_dt, min_dt + pd.Timedelta(hours=3)) if len(df) > 1 else (min_dt, max_dt),
-                step=pd.Timedelta(hours=3),
-                format="HH:mm, MMM DD"
-            )
-        mask = (df[use_col] >= pd.to_datetime(start_dt[0])) & (df[use_col] <= pd.to_datetime(start_dt[1]))
-        df_sel = df.loc[mask].copy()
-    else:
-        df_sel = df.copy()
-
-    if df_sel.empty:
-        st.warning("No data in selected time range.")
-        st.stop()
-        
-    now = df_sel.iloc[0]
-
-    # prepare MET REPORT values (diperlukan untuk bagian di bawah dan QAM)
-    dewpt = estimate_dewpoint(now.get("t"), now.get("hu"))
-    dewpt_disp = f"{dewpt:.1f}°C" if dewpt is not None else "—"
-    ceiling_est_ft, ceiling_label = ceiling_proxy_from_tcc(now.get("tcc"))
-    ceiling_display = f"{ceiling_est_ft} ft" if ceiling_est_ft is not None and ceiling_est_ft <= 99999 else "—"
-    
-    # NEW: Konversi Visibilitas ke Statute Miles
-    vis_sm_disp = convert_vis_to_sm(now.get('vs'))
-
-    
-# =====================================
-# ✈ FLIGHT WEATHER STATUS (KEY METRICS)
-# =====================================
-    st.markdown("---") # Garis pemisah sebelum Key Metrics
-    st.markdown('<div class="flight-card">', unsafe_allow_html=True)
-    st.markdown('<div class="flight-title">✈ Key Meteorological Status</div>', unsafe_allow_html=True)
-    
-    colA, colB, colC, colD = st.columns(4)
-    with colA:
-        st.markdown("<div class='metric-label'>Temperature (°C)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='metric-value'>{now.get('t','—')}</div>", unsafe_allow_html=True)
-        st.markdown("<div class='small-note'>Ambient</div>", unsafe_allow_html=True)
-    with colB:
-        st.markdown("<div class='metric-label'>Wind Speed (KT)</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='metric-value'>{now.get('ws_kt',0):.1f}</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='small-note'>{now.get('wd_deg','—')}°</div>", unsafe_allow_html=True)
-    with colC:
-        st.markdown("<div class='metric-label'>Visibility (M/SM)</div>", unsafe_allow_html=True) # LABEL DIUBAH
-        st.markdown(f"<div class='metric-value'>{now.get('vs','—')}</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='small-note'>({vis_sm_disp}) / {now.get('vs_text','—')}</div>", unsafe_allow_html=True) # NILAI SM DITAMBAH
-    with colD:
-        st.markdown("<div class='metric-label'>Weather</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='metric-value'>{now.get('weather_desc','—')}</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='small-note'>Rain: {now.get('tp',0):.1f} mm (Accum.)</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-
-    # -----------------------------
-    # INSERT HUD (MODE B) — PANEL
-    # -----------------------------
-    # Render HUD wrapper with data-mode attribute so CSS picks Day/Night
-    hud_wrapper_open = f"<div id='f16hud-wrapper' data-mode='{CURRENT_MODE}'>"
-    st.markdown(hud_wrapper_open, unsafe_allow_html=True)
-    st.markdown("<div id='f16hud-container'>", unsafe_allow_html=True)
-    st.markdown("<div id='f16hud-title'>F-16 TACTICAL HUD OVERLAY — PANEL (Mode B)</div>", unsafe_allow_html=True)
-
-    # dynamic HUD variables (safe)
-    _wdir = safe_int(now.get("wd_deg"), default=0)
-    _wspd = safe_float(now.get("ws_kt"), default=0.0)
-    _vis = safe_int(now.get("vs"), default=0)
-    _ceil = safe_int(ceiling_est_ft, default=0)
-
-    # limit wind arrow length so it fits nicely
-    max_arrow_len = 120
-    arrow_len = min(max_arrow_len, int(_wspd * 3))  # scaling factor for visibility in HUD
-
-    # Compute end point of arrow relative to center (400,150) used below
-    dx = np.sin(np.radians(_wdir)) * arrow_len
-    dy = -np.cos(np.radians(_wdir)) * arrow_len  # negative because SVG Y increases downward
-
-    hud_svg = f"""
-    <svg id="f16hud-svg" viewBox="0 0 800 300" preserveAspectRatio="xMidYMid meet">
-      <!-- Horizon -->
-      <line x1="50" y1="150" x2="750" y2="150" class="hud-glow" stroke="#0f0" stroke-width="1.5"/>
-      <!-- Pitch Ladder short marks -->
-      <line x1="140" y1="120" x2="200" y2="120" class="hud-glow" stroke="#0f0" stroke-width="1"/>
-      <line x1="140" y1="180" x2="200" y2="180" class="hud-glow" stroke="#0f0" stroke-width="1"/>
-      <!-- Heading -->
-      <text x="400" y="42" fill="#0f0" font-size="22" text-anchor="middle">HDG {_wdir:03d}°</text>
-      <!-- Wind arrow from center -->
-      <line id="hud-wind-arrow" x1="400" y1="150" x2="{400 + dx:.1f}" y2="{150 + dy:.1f}" stroke="#0f0" />
-      <polygon points="{400 + dx:.1f},{150 + dy:.1f} {400 + dx - 6:.1f},{150 + dy - 6:.1f} {400 + dx + 6:.1f},{150 + dy - 6:.1f}" fill="#0f0"/>
-      <!-- Wind readout -->
-      <text x="400" y="190" fill="#0f0" font-size="18" text-anchor="middle">WIND {_wdir}° / {_wspd:.1f} KT</text>
-      <!-- Visibility and Ceiling -->
-      <text x="120" y="260" fill="#0f0" font-size="16">VIS: {_vis} m ({convert_vis_to_sm(_vis)})</text>
-      <text x="680" y="260" fill="#0f0" font-size="16" text-anchor="end">CEIL: {_ceil} ft</text>
-      <!-- Tactical quick statuses -->
-      <rect x="18" y="18" width="110" height="28" fill="rgba(0,0,0,0.3)" stroke="#0f0" rx="6"/>
-      <text x="74" y="36" fill="#0f0" font-size="12" text-anchor="middle">TACTICAL</text>
-    </svg>
-    """
-
-    st.markdown(hud_svg, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)  # close container
-    st.markdown("</div>", unsafe_allow_html=True)  # close wrapper
-
-# =====================================
-# ☁ METEOROLOGICAL DETAILS (SECONDARY) - REVISI
-# =====================================
-    st.markdown('<div class="flight-card">', unsafe_allow_html=True)
-    st.markdown('<div class="flight-title">☁ Meteorological Details</div>', unsafe_allow_html=True)
-
-    detail_col1, detail_col2 = st.columns(2)
-
-    with detail_col1:
-        st.markdown("##### 🌡️ Atmospheric State")
-        # Row 1: Temperature & Dew Point
-        col_t, col_dp = st.columns(2)
-        with col_t:
-            st.markdown("<div class='metric-label'>Air Temperature (°C)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{now.get('t','—')}°C</div>", unsafe_allow_html=True)
-        with col_dp:
-            st.markdown("<div class='metric-label'>Dew Point (Est)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{dewpt_disp}</div>", unsafe_allow_html=True)
-
-        # Row 2: Humidity & Wind Dir Code
-        col_hu, col_wd = st.columns(2)
-        with col_hu:
-            st.markdown("<div class='metric-label'>Relative Humidity (%)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{now.get('hu','—')}%</div>", unsafe_allow_html=True)
-        with col_wd:
-            st.markdown("<div class='metric-label'>Wind Direction (Code)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{now.get('wd','—')} ({now.get('wd_deg','—')}°)</div>", unsafe_allow_html=True)
-        
-        # Row 3: Location Details (Moved here)
-        st.markdown("<div style='margin-top: 15px;'></div>", unsafe_allow_html=True)
-        col_prov, col_city = st.columns(2)
-        with col_prov:
-            st.markdown("<div classs='metric-label'>Province</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value' style='font-size: 1.0rem;'>{now.get('provinsi','—')}</div>", unsafe_allow_html=True)
-        with col_city:
-            st.markdown("<div class='metric-label'>City/Regency</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value' style='font-size: 1.0rem;'>{now.get('kotkab','—')}</div>", unsafe_allow_html=True)
-
-
-    with detail_col2:
-        st.markdown("##### 🌁 Sky and Visibility")
-        # Row 1: Visibility & Ceiling
-        col_vis, col_ceil = st.columns(2)
-        with col_vis:
-            st.markdown("<div class='metric-label'>Visibility (Metres/SM)</div>", unsafe_allow_html=True) # LABEL DIUBAH
-            st.markdown(f"<div class='detail-value'>{now.get('vs','—')} m</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='small-note'>({vis_sm_disp}) / {now.get('vs_text','—')}</div>", unsafe_allow_html=True) # NILAI SM DITAMBAH
-        with col_ceil:
-            st.markdown("<div class='metric-label'>Est. Ceiling Base</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{ceiling_display}</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='small-note'>({ceiling_label.split('(')[0].strip()})</div>", unsafe_allow_html=True)
-
-        # Row 2: Cloud Cover & Weather Desc
-        col_tcc, col_wx = st.columns(2)
-        with col_tcc:
-            st.markdown("<div class='metric-label'>Cloud Cover (%)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{now.get('tcc','—')}%</div>", unsafe_allow_html=True)
-        with col_wx:
-            st.markdown("<div class='metric-label'>Present Weather</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value'>{now.get('weather_desc','—')} ({now.get('weather','—')})</div>", unsafe_allow_html=True)
-        
-        # Row 3: Time Index/Local Time
-        st.markdown("<div style='margin-top: 15px;'></div>", unsafe_allow_html=True)
-        col_local, col_anal = st.columns(2)
-        with col_local:
-            st.markdown("<div class='metric-label'>Local Forecast Time</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value' style='font-size: 1.0rem;'>{now.get('local_datetime','—')}</div>", unsafe_allow_html=True)
-        with col_anal:
-            st.markdown("<div class='metric-label'>Analysis Time (UTC)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='detail-value' style='font-size: 1.0rem;'>{now.get('analysis_date','—')}</div>", unsafe_allow_html=True)
-
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-# =====================================
-# === MET REPORT (QAM REPLICATION) - DIPINDAHKAN KE SIDEBAR
-# =====================================
-
-    if show_qam_report:
-        # prepare MET REPORT values
-        visibility_m = now.get('vs')
-        wind_info = f"{now.get('wd_deg','—')}° / {now.get('ws_kt',0):.1f} KT"
-        wind_variation = "Not available (BMKG Forecast)"  
-        ceiling_full_desc = f"Est. Base: {ceiling_est_ft} ft ({ceiling_label.split('(')[0].strip()})" if ceiling_est_ft is not None and ceiling_est_ft <= 99999 else "—"
-
-
-        # 📌 START: MEMBANGUN HTML UNTUK LAPORAN QAM
-        met_report_html_content = f"""
-        <div class="met-report-container">
-            <div class="met-report-header">MARKAS BESAR ANGKATAN UDARA</div>
-            <div class="met-report-subheader">DINAS PENGEMBANGAN OPERASI</div>
-            <div class="met-report-header" style="border-top: none;">METEOROLOGICAL REPORT FOR TAKE OFF AND LANDING</div>
-            <table class="met-report-table">
-                <tr>
-                    <th>METEOROLOGICAL OBS AT / DATE / TIME</th>
-                    <td>{now.get('local_datetime','—')} (Local) / {now.get('utc_datetime','—')} (UTC)</td>
-                </tr>
-                <tr>
-                    <th>AERODROME IDENTIFICATION</th>
-                    <td>{icao_code} / {now.get('kotkab','—')} ({now.get('adm2','—')})</td>
-                </tr>
-                <tr>
-                    <th>SURFACE WIND DIRECTION, SPEED AND SIGNIFICANT VARIATION</th>
-                    <td>{wind_info} / Variation: {wind_variation}</td>
-                </tr>
-                <tr>
-                    <th>HORIZONTAL VISIBILITY</th>
-                    <td>{visibility_m} m ({vis_sm_disp}) / {now.get('vs_text','—')}</td> </tr>
-                <tr>
-                    <th>RUNWAY VISUAL RANGE</th>
-                    <td>— (RVR not available)</td>
-                </tr>
-                <tr>
-                    <th>PRESENT WEATHER</th>
-                    <td>{now.get('weather_desc','—')} (Accum. Rain: {now.get('tp',0):.1f} mm)</td>
-                </tr>
-                <tr>
-                    <th>AMOUNT AND HEIGHT OF BASE OF LOW CLOUD</th>
-                    <td>Cloud Cover: {now.get('tcc','—')}% / {ceiling_full_desc}</td>
-                </tr>
-                <tr>
-                    <th>AIR TEMPERATURE AND DEW POINT TEMPERATURE</th>
-                    <td>Air Temp: {now.get('t','—')}°C / Dew Point: {dewpt_disp} / RH: {now.get('hu','—')}%</td>
-                </tr>
-                <tr>
-                    <th>QNH</th>
-                    <td>
-                        ................. mbs<br>
-                        ................. ins*<br>
-                        ................. mm Hg*
-                        <span style='font-size: 0.75rem; color:#777;'> (Barometric Data not available from Source)</span>
-                    </td>
-                </tr>
-                <tr>
-                    <th>QFE*</th>
-                    <td>
-                        ................. mbs<br>
-                        ................. ins*<br>
-                        ................. mm Hg*
-                    </td>
-                </tr>
-                <tr>
-                    <th>SUPPLEMENTARY INFORMATION</th>
-                    <td>{now.get('provinsi','—')} / Latitude: {now.get('lat','—')}, Longitude: {now.get('lon','—')}</td>
-                </tr>
-                <tr>
-                    <th>TIME OF ISSUE (UTC) / OBSERVER</th>
-                    <td>{now.get('utc_datetime','—')} / FCST ON DUTY</td>
-                </tr>
-            </table>
-        </div>
-        """
-        # 📌 END: MEMBANGUN HTML UNTUK LAPORAN QAM
-
-        # Menggabungkan CSS dan konten HTML untuk file yang diunduh
-        full_qam_html = f"<html><head>{CSS_STYLES}</head><body>{met_report_html_content}</body></html>"
-
-        st.markdown("---")
-        st.subheader("📝 Meteorological Report (QAM/Form Replication)")
-        st.markdown(met_report_html_content, unsafe_allow_html=True)
-        
-        # Implementasi tombol Download QAM
-        qam_filename = f"MET_REPORT_{loc_choice}_{now.get('local_datetime','—').replace(' ', '_').replace(':','')}.html"
-        st.download_button(
-            label="⬇ Download QAM Report (HTML)",
-            data=full_qam_html,
-            file_name=qam_filename,
-            mime="text/html",
-            help="Unduh laporan QAM sebagai file HTML. Buka di browser dan gunakan fungsi 'Cetak ke PDF' untuk konversi formal."
-        )
-        st.markdown("---")
-
-# =====================================
-# === DECISION MATRIX (KRUSIAL)
-# =====================================
-    ifr_vfr = classify_ifr_vfr(now.get("vs"), ceiling_est_ft)
-    takeoff_reco, landing_reco, reco_rationale = takeoff_landing_recommendation(now.get("ws_kt"), now.get("vs"), now.get("tp"))
-
-    st.markdown("---")
-    st.subheader("🔴 Operational Decision Matrix")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown("**Regulatory Category**")
-        ifr_badge = badge_html(ifr_vfr)
-        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{ifr_badge}  <strong style='margin-left:8px;'>{ifr_vfr}</strong></div>", unsafe_allow_html=True)
-    with col2:
-        st.markdown("**Takeoff Recommendation**")
-        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{badge_html(takeoff_reco)}  <strong style='margin-left:8px;'>{takeoff_reco}</strong></div>", unsafe_allow_html=True)
-    with col3:
-        st.markdown("**Landing Recommendation**")
-        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{badge_html(landing_reco)}  <strong style='margin-left:8px;'>{landing_reco}</strong></div>", unsafe_allow_html=True)
-
-    # Rationale / Notes
-    st.markdown("**Rationale / Notes:**")
-    for r in reco_rationale:
-        st.markdown(f"- {r}")
-    st.markdown("---")
-
-# =====================================
-# 📈 TRENDS
-# =====================================
-    st.subheader("📊 Parameter Trends")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.plotly_chart(px.line(df_sel, x="local_datetime_dt", y="t", title="Temperature"), use_container_width=True)
-        st.plotly_chart(px.line(df_sel, x="local_datetime_dt", y="hu", title="Humidity"), use_container_width=True)
-    with c2:
-        st.plotly_chart(px.line(df_sel, x="local_datetime_dt", y="ws_kt", title="Wind (KT)"), use_container_width=True)
-        st.plotly_chart(px.bar(df_sel, x="local_datetime_dt", y="tp", title="Rainfall"), use_container_width=True)
-
-# =====================================
-# 🌪️ WINDROSE (ASLI)
-# =====================================
-    st.markdown("---")
-    st.subheader("🌪️ Windrose — Direction & Speed")
-    if "wd_deg" in df_sel.columns and "ws_kt" in df_sel.columns:
-        df_wr = df_sel.dropna(subset=["wd_deg","ws_kt"])
-        if not df_wr.empty:
-            bins_dir = np.arange(-11.25,360,22.5)
-            labels_dir = ["N","NNE","NE","ENE","E","ESE","SE","SSE",
-                          "S","SSW","SW","WSW","W","WNW","NW","NNW"]
-            
-            df_wr["dir_sector"] = pd.cut(df_wr["wd_deg"] % 360, bins=bins_dir, labels=labels_dir, include_lowest=True)  
-            
-            speed_bins = [0,5,10,20,30,50,100]
-            speed_labels = ["<5","5–10","10–20","20–30","30–50",">50"]
-            
-            df_wr["speed_class"] = pd.cut(df_wr["ws_kt"], bins=speed_bins, labels=speed_labels, include_lowest=True)
-            
-            freq = df_wr.groupby(["dir_sector","speed_class"]).size().reset_index(name="count")
-            
-            freq["percent"] = freq["count"]/freq["count"].sum()*100
-            az_map = {
-                "N":0,"NNE":22.5,"NE":45,"ENE":67.5,"E":90,"ESE":112.5,"SE":135,
-                "SSE":157.5,"S":180,"SSW":202.5,"SW":225,"WSW":247.5,"W":270,
-                "WNW":292.5,"NW":315,"NNW":337.5
-            }
-            freq["theta"] = freq["dir_sector"].map(az_map)
-            colors = ["#00ffbf","#80ff00","#d0ff00","#ffb300","#ff6600","#ff0033"]
-            fig_wr = go.Figure()
-            for i, sc in enumerate(speed_labels):
-                subset = freq[freq["speed_class"]==sc]
-                fig_wr.add_trace(go.Barpolar(
-                    r=subset["percent"], theta=subset["theta"],
-                    name=f"{sc} KT", marker_color=colors[i], opacity=0.85
-                ))
-            fig_wr.update_layout(
-                title="Windrose (KT)",
-                polar=dict(
-                    angularaxis=dict(direction="clockwise", rotation=90, tickvals=list(range(0,360,45))),
-                    radialaxis=dict(ticksuffix="%", showline=True, gridcolor="#333")
-                ),
-                legend_title="Wind Speed Class",
-                template="plotly_dark"
-            )
-            st.plotly_chart(fig_wr, use_container_width=True)
-        else:
-            st.info("Insufficient wind data for Windrose plot.")
-    else:
-        st.info("Wind data (wd_deg, ws_kt) not available in dataset for windrose.")
-
-# =====================================
-# 🗺️ MAP
-# =====================================
-    if show_map:
-        st.markdown("---")
-        st.subheader("🗺️ Tactical Map")
-        try:
-            lat = float(selected_entry.get("lokasi", {}).get("lat", 0))
-            lon = float(selected_entry.get("lokasi", {}).get("lon", 0))
-            st.map(pd.DataFrame({"lat":[lat],"lon":[lon]}))
-        except Exception as e:
-            st.warning(f"Map unavailable: {e}")
-
-# =====================================
-# 📋 TABLE
-# =====================================
-    if show_table:
-        st.markdown("---")
-        st.subheader("📋 Forecast Table")
-        st.dataframe(df_sel)
-
-# =====================================
-# 💾 EXPORT
-# =====================================
-    st.markdown("---")
-    st.subheader("💾 Export Data")
-    # Tombol download QAM sudah dipindahkan ke dalam blok show_qam_report di atas.
-    csv = df_sel.to_csv(index=False)
-    json_text = df_sel.to_json(orient="records", force_ascii=False, date_format="iso")
-    colA, colB = st.columns(2)
-    with colA:
-        st.download_button("⬇ CSV", csv, file_name=f"{adm1}_{loc_choice}.csv", mime="text/csv")
-    with colB:
-        st.download_button("⬇ JSON", json_text, file_name=f"{adm1}_{loc_choice}.json", mime="application/json")
-
-
-# BLOK EXCEPT DIMULAI DI SINI UNTUK MENUTUP BLOK TRY
-except requests.exceptions.HTTPError as e:
-    st.error(f"API Error: Could not fetch data. Check Province Code (ADM1). Status code: {e.response.status_code}")
-except requests.exceptions.ConnectionError:
-    st.error("Connection Error: Could not connect to BMKG API.")
-except Exception as e:
-    # Error ini akan menangkap error lain yang tidak terduga.
-    st.error(f"An unexpected error occurred: {e}")
-
-# =====================================
-# ⚓ FOOTER
-# =====================================
-st.markdown("""
----
-<div style="text-align:center; color:#7a7; font-size:0.9rem;">
-Tactical Weather Ops Dashboard — BMKG Data © 2025<br>
-Military Ops UI · Streamlit + Plotly
-</div>
-""", unsafe_allow_html=True)
+import streamlit as st
+import requests
+import html
+import io
+import math
+import os
+import re
+import tempfile
+import orjson
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from datetime import datetime, timezone
+from pathlib import Path
+from string import Template
+from urllib3.util.retry import Retry
+
+# =====================================
+# ⚙️ KONFIGURASI DASAR
+# =====================================
+st.set_page_config(page_title="Tactical Weather Ops — BMKG", layout="wide")
+
+# =====================================
+# 🌑 CSS — MILITARY STYLE + RADAR ANIMATION + FLIGHT PANEL + MET REPORT TABLE
+# =====================================
+
+# Menyimpan CSS styling untuk digunakan dalam file HTML QAM yang diunduh
+CSS_STYLES = """
+<style>
+/* Base theme */
+body {
+    background-color: #0b0c0c;
+    color: #cfd2c3;
+    font-family: "Consolas", "Roboto Mono", monospace;
+}
+/* Custom CSS for the MET REPORT TABLE (REVISED QAM FORMAT) */
+.met-report-table {
+    border: 1px solid #2b3c2b;
+    width: 100%;
+    margin-bottom: 20px;
+    background-color: #0f1111;
+    font-size: 0.95rem;
+    border-collapse: collapse;
+}
+.met-report-table th, .met-report-table td {
+    border: 1px solid #2b3c2b;
+    padding: 8px;
+    text-align: left;
+    vertical-align: top;
+}
+.met-report-table th {
+    background-color: #111;
+    color: #a9df52;
+    text-transform: uppercase;
+    width: 45%;
+    font-size: 0.85rem;
+}
+.met-report-table td {
+    color: #dfffe0;
+    width: 55%;
+    font-weight: bold;
+}
+.met-report-header {
+    text-align: center;
+    background-color: #0b0c0c;
+    color: #a9df52;
+    font-weight: bold;
+    font-size: 1.1rem;
+    padding: 10px 0;
+    border: 1px solid #2b3c2b;
+    border-bottom: none;
+}
+.met-report-subheader {
+    text-align: center;
+    background-color: #0b0c0c;
+    color: #cfd2c3;
+    font-weight: normal;
+    font-size: 0.8rem;
+    padding-bottom: 5px;
+}
+/* Print styles untuk memastikan warna tetap muncul saat cetak ke PDF */
+@media print {
+    body {
+        -webkit-print-color-adjust: exact;
+        color-adjust: exact;
+    }
+}
+
+/* Custom CSS for METAR Block (Dihapus dari skrip utama, namun CSS-nya tetap di sini) */
+.metar-block {
+    background-color: #1a2a1f;
+    border: 1px solid #3f4f3f;
+    padding: 15px;
+    border-radius: 8px;
+    margin-bottom: 20px;
+    font-family: 'Consolas', monospace;
+    font-size: 1.1rem;
+    color: #b6ff6d;
+    overflow-x: auto; /* Untuk METAR yang sangat panjang */
+}
+.metar-title {
+    color: #9adf4f;
+    font-size: 0.9rem;
+    text-transform: uppercase;
+    margin-bottom: 8px;
+}
+
+</style>
+"""
+
+# CSS khusus dashboard Streamlit (tidak ikut ke file HTML QAM)
+STREAMLIT_CSS = """
+<style>
+/* CSS Streamlit Khusus */
+h1, h2, h3, h4 {
+    color: #a9df52;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+section[data-testid="stSidebar"] {
+    background-color: #111;
+    color: #d0d3ca;
+}
+.stButton>button {
+    background-color: #1a2a1f;
+    color: #a9df52;
+    border: 1px solid #3f4f3f;
+    border-radius: 8px;
+    font-weight: bold;
+}
+/* ... (lanjutan CSS Streamlit) ... */
+.radar {
+  position: relative;
+  width: 160px;
+  height: 160px;
+  border-radius: 50%;
+  background: radial-gradient(circle, rgba(20,255,50,0.05) 20%, transparent 21%),
+              radial-gradient(circle, rgba(20,255,50,0.1) 10%, transparent 11%);
+  background-size: 20px 20px;
+  border: 2px solid #33ff55;
+  overflow: hidden;
+  margin: auto;
+  box-shadow: 0 0 20px #33ff55;
+}
+.radar:before {
+  content: "";
+  position: absolute;
+  top: 0; left: 0;
+  width: 50%; height: 2px;
+  background: linear-gradient(90deg, #33ff55, transparent);
+  transform-origin: 100% 50%;
+  animation: sweep 2.5s linear infinite;
+}
+@keyframes sweep {
+  from { transform: rotate(0deg); }
+  to { transform: rotate(360deg); }
+}
+hr, .stDivider {
+    border-top: 1px solid #2f3a2f;
+}
+.flight-card {
+    padding: 20px 24px;
+    background-color: #0f1111;
+    border: 1px solid #2b3c2b;
+    border-radius: 10px;
+    margin-bottom: 22px;
+}
+.flight-title {
+    font-size: 1.25rem;
+    font-weight: 700;
+    color: #9adf4f;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    margin-bottom: 14px;
+}
+.metric-label {
+    font-size: 0.70rem;
+    text-transform: uppercase;
+    color: #9fa8a0;
+    letter-spacing: 0.6px;
+    margin-bottom: -6px;
+}
+.metric-value {
+    font-size: 1.9rem;
+    color: #b6ff6d;
+    margin-top: -6px;
+    font-weight: 700;
+}
+.small-note {
+    font-size: 0.78rem;
+    color: #9fa8a0;
+}
+.badge-green { color:#002b00; background:#b6ff6d; padding:4px 8px; border-radius:6px; font-weight:700; }
+.badge-yellow { color:#4a3b00; background:#ffd86b; padding:4px 8px; border-radius:6px; font-weight:700; }
+.badge-red { color:#2b0000; background:#ff6b6b; padding:4px 8px; border-radius:6px; font-weight:700; }
+.detail-value {
+    font-size: 1.2rem;
+    color: #dfffe0;
+    font-weight: bold;
+}
+/* grid sel metrik: satu blok HTML per kartu (pengganti st.columns + banyak st.markdown) */
+.metric-grid {
+    display: grid;
+    grid-template-columns: repeat(4, minmax(0, 1fr));
+    gap: 16px 20px;
+}
+.metric-grid.cols-2 {
+    grid-template-columns: repeat(2, minmax(0, 1fr));
+}
+.metric-cell .metric-label {
+    margin-bottom: 2px;
+}
+.metric-cell .metric-value {
+    margin-top: 0;
+}
+.metric-grid h5 {
+    margin: 0 0 8px 0;
+}
+@media (max-width: 640px) {
+    .metric-grid { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+    .metric-grid.cols-2 { grid-template-columns: minmax(0, 1fr); }
+}
+
+/* -----------------------------
+   HUD wrapper specific styles
+   ----------------------------- */
+#f16hud-wrapper[data-mode='day'] #f16hud-container {
+    background: rgba(200, 255, 200, 0.12);
+    border-color: #7fbf7f;
+    box-shadow: 0 0 10px #7f7 inset;
+}
+#f16hud-wrapper[data-mode='night'] #f16hud-container {
+    background: rgba(0, 10, 0, 0.75);
+    border-color: #0f0;
+    box-shadow: 0 0 20px #0f0 inset;
+}
+#f16hud-container {
+    width: 100%;
+    background: rgba(0, 10, 0, 0.70);
+    border: 1px solid #1f3;
+    border-radius: 12px;
+    padding: 12px;
+    margin-top: 18px;
+    box-shadow: 0 0 15px #0f0 inset;
+}
+#f16hud-title {
+    color: #0f0;
+    font-size: 1.05rem;
+    text-align: center;
+    margin-bottom: 8px;
+    text-shadow: 0 0 6px #0f0;
+}
+#f16hud-svg {
+    width: 100%;
+    height: 220px;
+    display: block;
+    margin: auto;
+}
+.hud-glow {
+    stroke: #0f0;
+    stroke-width: 2;
+    fill: none;
+    filter: drop-shadow(0 0 6px #0f0);
+}
+#hud-wind-arrow {
+    stroke-width: 3;
+    stroke-linecap: round;
+    animation: windPulse 1.8s infinite ease-in-out;
+}
+@keyframes windPulse {
+    0%   { stroke-opacity: 0.4; }
+    50%  { stroke-opacity: 1.0; }
+    100% { stroke-opacity: 0.4; }
+}
+</style>
+"""
+
+# Stylesheet lengkap digabung sekali; tetap dirender setiap rerun karena Streamlit
+# menghapus elemen yang tidak dipanggil ulang (guard session_state akan menghilangkan CSS)
+DASHBOARD_CSS = CSS_STYLES + STREAMLIT_CSS
+
+# Menyuntikkan seluruh CSS ke Streamlit (termasuk yang tidak relevan untuk QAM, untuk tampilan dashboard)
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
+
+# =====================================
+# 📝 TEMPLATE MET REPORT (QAM)
+# =====================================
+# Template di-parse sekali; saat render cukup satu substitute() dari dict field
+QAM_TEMPLATE = Template("""
+<div class="met-report-container">
+    <div class="met-report-header">MARKAS BESAR ANGKATAN UDARA</div>
+    <div class="met-report-subheader">DINAS PENGEMBANGAN OPERASI</div>
+    <div class="met-report-header" style="border-top: none;">METEOROLOGICAL REPORT FOR TAKE OFF AND LANDING</div>
+    <table class="met-report-table">
+        <tr>
+            <th>METEOROLOGICAL OBS AT / DATE / TIME</th>
+            <td>$local_datetime (Local) / $utc_datetime (UTC)</td>
+        </tr>
+        <tr>
+            <th>AERODROME IDENTIFICATION</th>
+            <td>$icao_code / $kotkab ($adm2)</td>
+        </tr>
+        <tr>
+            <th>SURFACE WIND DIRECTION, SPEED AND SIGNIFICANT VARIATION</th>
+            <td>$wind_info / Variation: $wind_variation</td>
+        </tr>
+        <tr>
+            <th>HORIZONTAL VISIBILITY</th>
+            <td>$visibility_m m ($vis_sm_disp) / $vs_text</td> </tr>
+        <tr>
+            <th>RUNWAY VISUAL RANGE</th>
+            <td>— (RVR not available)</td>
+        </tr>
+        <tr>
+            <th>PRESENT WEATHER</th>
+            <td>$weather_desc (Accum. Rain: $tp mm)</td>
+        </tr>
+        <tr>
+            <th>AMOUNT AND HEIGHT OF BASE OF LOW CLOUD</th>
+            <td>Cloud Cover: $tcc% / $ceiling_full_desc</td>
+        </tr>
+        <tr>
+            <th>AIR TEMPERATURE AND DEW POINT TEMPERATURE</th>
+            <td>Air Temp: $t°C / Dew Point: $dewpt_disp / RH: $hu%</td>
+        </tr>
+        <tr>
+            <th>QNH</th>
+            <td>
+                ................. mbs<br>
+                ................. ins*<br>
+                ................. mm Hg*
+                <span style='font-size: 0.75rem; color:#777;'> (Barometric Data not available from Source)</span>
+            </td>
+        </tr>
+        <tr>
+            <th>QFE*</th>
+            <td>
+                ................. mbs<br>
+                ................. ins*<br>
+                ................. mm Hg*
+            </td>
+        </tr>
+        <tr>
+            <th>SUPPLEMENTARY INFORMATION</th>
+            <td>$provinsi / Latitude: $lat, Longitude: $lon</td>
+        </tr>
+        <tr>
+            <th>TIME OF ISSUE (UTC) / OBSERVER</th>
+            <td>$utc_datetime / FCST ON DUTY</td>
+        </tr>
+    </table>
+</div>
+""")
+
+# Field yang diambil langsung dari baris forecast (default "—")
+QAM_NOW_FIELDS = (
+    "local_datetime", "utc_datetime", "kotkab", "adm2", "vs_text", "weather_desc",
+    "tcc", "t", "hu", "provinsi", "lat", "lon",
+)
+
+# =====================================
+# 🟢 HUD + DAY/NIGHT LOGIC (ADDITIONAL BLOCKS)
+# =====================================
+
+# Helper: safe numeric getters to avoid formatting errors
+def safe_float(val, default=0.0):
+    try:
+        if val is None or (isinstance(val, float) and np.isnan(val)):
+            return default
+        return float(val)
+    except Exception:
+        return default
+
+def safe_int(val, default=0):
+    try:
+        if val is None or (isinstance(val, float) and np.isnan(val)):
+            return default
+        return int(round(float(val)))
+    except Exception:
+        return default
+
+# Helper: angka 1 desimal untuk tampilan; kosong/NaN jadi "—" (bukan 0.0 atau "nan")
+def fmt_1f(val):
+    return f"{val:.1f}" if val is not None and pd.notna(val) else "—"
+
+# HUD SVG: markup statis di-compile sekali; hanya angka yang diisi per rerun
+HUD_SVG_TEMPLATE = Template("""
+    <svg id="f16hud-svg" viewBox="0 0 800 300" preserveAspectRatio="xMidYMid meet">
+      <!-- Horizon -->
+      <line x1="50" y1="150" x2="750" y2="150" class="hud-glow" stroke="#0f0" stroke-width="1.5"/>
+      <!-- Pitch Ladder short marks -->
+      <line x1="140" y1="120" x2="200" y2="120" class="hud-glow" stroke="#0f0" stroke-width="1"/>
+      <line x1="140" y1="180" x2="200" y2="180" class="hud-glow" stroke="#0f0" stroke-width="1"/>
+      <!-- Heading -->
+      <text x="400" y="42" fill="#0f0" font-size="22" text-anchor="middle">HDG ${hdg}°</text>
+      <!-- Wind arrow from center -->
+      <line id="hud-wind-arrow" x1="400" y1="150" x2="${tip_x}" y2="${tip_y}" stroke="#0f0" />
+      <polygon points="${tip_x},${tip_y} ${left_x},${back_y} ${right_x},${back_y}" fill="#0f0"/>
+      <!-- Wind readout -->
+      <text x="400" y="190" fill="#0f0" font-size="18" text-anchor="middle">WIND ${wdir}° / ${wspd} KT</text>
+      <!-- Visibility and Ceiling -->
+      <text x="120" y="260" fill="#0f0" font-size="16">VIS: ${vis} m (${vis_sm})</text>
+      <text x="680" y="260" fill="#0f0" font-size="16" text-anchor="end">CEIL: ${ceil} ft</text>
+      <!-- Tactical quick statuses -->
+      <rect x="18" y="18" width="110" height="28" fill="rgba(0,0,0,0.3)" stroke="#0f0" rx="6"/>
+      <text x="74" y="36" fill="#0f0" font-size="12" text-anchor="middle">TACTICAL</text>
+    </svg>
+    """)
+
+# Day/night control in sidebar (hybrid Auto + manual override)
+with st.sidebar:
+    st.markdown("---")
+    st.subheader("🌗 Display Mode")
+    override_mode = st.selectbox("Override Mode", ["Auto", "Day", "Night"], index=0)
+
+def get_day_night_mode():
+    if override_mode == "Day": return "day"
+    if override_mode == "Night": return "night"
+    # AUTO MODE (local)
+    hour = datetime.now().hour
+    return "day" if 6 <= hour < 18 else "night"
+
+CURRENT_MODE = get_day_night_mode()
+
+# =====================================
+# 📡 KONFIGURASI API
+# =====================================
+API_BASE = "https://cuaca.bmkg.go.id/api/df/v1/forecast/adm"
+MS_TO_KT = 1.94384 # konversi ke knot
+METER_TO_SM = 0.000621371 # 1 meter = 0.000621371 statute miles (SM)
+BMKG_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S" # format utc_datetime/local_datetime dari API
+NUMERIC_COLS = ("t", "tcc", "tp", "wd_deg", "ws", "hu", "vs", "ws_kt", "lat", "lon") # kolom forecast + koordinat lokasi yang dipaksa numerik
+TABLE_COLS = (
+    "local_datetime_dt", "utc_datetime_dt", "weather_desc", "t", "dewpt", "hu", "tcc", "ceiling_label",
+    "tp", "wd", "wd_deg", "ws_kt", "vs", "vs_text", "flight_cat", "takeoff_reco", "landing_reco",
+) # kolom yang ditampilkan di Forecast Table (urut tampilan)
+EXPORT_DROP_COLS = ("image", "time_index") # kolom bantu yang tidak ikut export (URL ikon, indeks slot waktu)
+MIN_TREND_POINTS = 2 # minimal baris dalam rentang waktu agar grafik tren digambar
+FORECAST_CACHE_DIR = Path(__file__).with_name(".cache") # salinan respons BMKG per adm1 (bertahan saat restart)
+FORECAST_STALE_MAX_HOURS = 6 # salinan disk lebih tua dari ini tidak dipakai sebagai fallback
+FORECAST_STALE_KEY = "_stale_stored_at" # penanda di payload bila yang disajikan salinan disk (BMKG tak terjangkau)
+ADM1_PATTERN = re.compile(r"\d+(\.\d+)*") # kode wilayah BMKG: angka dipisah titik (mis. 32, 32.01)
+
+# Windrose: batas sektor arah, sudut (derajat) tiap indeks sektor 0..15, kelas kecepatan (KT)
+WINDROSE_DIR_BINS = np.arange(-11.25, 360, 22.5)
+WINDROSE_THETA = np.arange(16) * 22.5
+WINDROSE_SPEED_BINS = np.array([0, 5, 10, 20, 30, 50, 100])
+WINDROSE_SPEED_LABELS = ("<5", "5–10", "10–20", "20–30", "30–50", ">50")
+WINDROSE_COLORS = ("#00ffbf", "#80ff00", "#d0ff00", "#ffb300", "#ff6600", "#ff0033")
+WINDROSE_LAYOUT = dict(
+    title=dict(text="Windrose (KT)"),
+    uirevision="windrose",  # zoom/legend di browser bertahan antar rerun
+    polar=dict(
+        angularaxis=dict(direction="clockwise", rotation=90, tickvals=list(range(0, 360, 45))),
+        radialaxis=dict(ticksuffix="%", showline=True, gridcolor="#333"),
+    ),
+    legend=dict(title=dict(text="Wind Speed Class")),
+    template="plotly_dark",
+)
+FOOTER_HTML = """
+<div style="text-align:center; color:#7a7; font-size:0.9rem;">
+Tactical Weather Ops Dashboard — BMKG Data © 2025<br>
+Military Ops UI · Streamlit + Plotly
+</div>
+""" # footer statis (st.html, bukan st.markdown)
+
+# =====================================
+# 🧰 UTILITAS
+# =====================================
+# Satu Session per proses server (bukan per rerun) agar koneksi TCP/TLS ke BMKG dipakai ulang saat cache habis
+@st.cache_resource(show_spinner=False)
+def http_session():
+    session = requests.Session()
+    # retry singkat HANYA untuk gagal membuka koneksi (connect). Read timeout tidak diulang (BMKG yang macet
+    # tidak menahan spinner 4x timeout) dan status HTTP (termasuk 429/503 + Retry-After) langsung diteruskan
+    # ke raise_for_status -> pesan "API Error ... Status code"
+    retries = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.3, respect_retry_after_header=False)
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    return session
+
+def _forecast_cache_paths(adm1: str):
+    # adm1 berasal dari input bebas: hanya kode angka/titik yang boleh menjadi nama file
+    if not ADM1_PATTERN.fullmatch(adm1):
+        return None, None
+    return FORECAST_CACHE_DIR / f"forecast_{adm1}.json", FORECAST_CACHE_DIR / f"forecast_{adm1}.meta"
+
+def _read_forecast_cache(adm1: str):
+    # (meta, path body) salinan disk; meta kosong jika belum ada / rusak
+    body_path, meta_path = _forecast_cache_paths(adm1)
+    if body_path is None or not body_path.exists():
+        return {}, body_path
+    try:
+        meta = orjson.loads(meta_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        meta = {}
+    return meta, body_path
+
+def _atomic_write(path: Path, data: bytes):
+    # tulis ke file sementara di direktori yang sama lalu os.replace: pembaca tidak pernah melihat file setengah jadi
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def _write_forecast_cache(adm1: str, meta: dict, body: bytes = None):
+    body_path, meta_path = _forecast_cache_paths(adm1)
+    if body_path is None:
+        return
+    try:
+        FORECAST_CACHE_DIR.mkdir(exist_ok=True)
+        if body is not None:
+            _atomic_write(body_path, body)
+        _atomic_write(meta_path, orjson.dumps(meta))
+    except OSError:
+        pass  # cache disk hanya optimasi; gagal tulis tidak menghentikan dashboard
+
+def forecast_age_hours(stored_at):
+    # umur (jam) salinan disk sejak terakhir dikonfirmasi BMKG; None jika stempel waktu tidak terbaca
+    try:
+        return (datetime.now(timezone.utc) - datetime.fromisoformat(stored_at)).total_seconds() / 3600
+    except (TypeError, ValueError):
+        return None
+
+@st.cache_data(ttl=300)
+def fetch_forecast(adm1: str):
+    # GET bersyarat (ETag / Last-Modified) terhadap salinan disk: 304 = pakai salinan tanpa unduh body.
+    # Jika BMKG tidak bisa dihubungi / error, salinan terakhir dipakai selama umurnya <= FORECAST_STALE_MAX_HOURS,
+    # dan ditandai FORECAST_STALE_KEY agar halaman menampilkan peringatan.
+    meta, body_path = _read_forecast_cache(adm1)
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        resp = http_session().get(API_BASE, params={"adm1": adm1}, headers=headers, timeout=10)
+        if resp.status_code == 304 and meta:
+            data = orjson.loads(body_path.read_bytes())
+            # salinan dikonfirmasi masih terbaru: stempel waktunya diperbarui
+            _write_forecast_cache(adm1, {**meta, "stored_at": datetime.now(timezone.utc).isoformat()})
+            return data
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+    except (requests.RequestException, orjson.JSONDecodeError):
+        age = forecast_age_hours(meta.get("stored_at"))
+        if age is None or age > FORECAST_STALE_MAX_HOURS:
+            raise
+        data = orjson.loads(body_path.read_bytes())
+        data[FORECAST_STALE_KEY] = meta["stored_at"]
+        return data
+    _write_forecast_cache(adm1, {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "stored_at": datetime.now(timezone.utc).isoformat(),
+    }, resp.content)
+    return data
+
+def parse_bmkg_datetime(values):
+    # format baku BMKG lewat parser cepat; hanya baris yang gagal dicoba ulang dengan format="mixed"
+    parsed = pd.to_datetime(values, format=BMKG_DATETIME_FORMAT, errors="coerce", cache=True)
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        # offset zona waktu (Z, +07:00) dibuang dulu: kolom tetap naive dengan jam dinding apa adanya,
+        # sama seperti baris berformat baku (pandas menolak nilai tz-aware di kolom naive)
+        wall = values[retry].astype(str).str.replace(r"(?:Z|[+-]\d{2}:?\d{2})$", "", regex=True)
+        try:
+            parsed[retry] = pd.to_datetime(wall, format="mixed", errors="coerce")
+        except (TypeError, ValueError):
+            pass  # biarkan NaT
+    return parsed
+
+def flatten_cuaca_entry(entry):
+    lokasi = entry.get("lokasi", {})
+    # satu list observasi -> DataFrame sekali jalan (tanpa copy/update dict per baris)
+    # kolom teks disimpan sebagai string pyarrow (default pandas 3; dipaksa juga di pandas 2.x)
+    with pd.option_context("future.infer_string", True):
+        df = pd.DataFrame([obs for group in entry.get("cuaca", []) for obs in group])
+        df = df.assign(**{k: lokasi.get(k) for k in ("adm1", "adm2", "provinsi", "kotkab", "lon", "lat")})
+    # safe datetime parse (vektor per kolom)
+    for c in ("utc_datetime", "local_datetime"):
+        df[f"{c}_dt"] = parse_bmkg_datetime(df[c]) if c in df.columns else pd.NaT
+    # BMKG umumnya mengirim angka JSON: kolom yang sudah int/float dilewati, hanya sisanya yang dikoersi
+    num_cols = [c for c in NUMERIC_COLS if c in df.columns and df[c].dtype.kind not in "iuf"]
+    if num_cols:
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+    # compute ws_kt if not already present (ikut ter-cache bersama frame)
+    if "ws_kt" not in df.columns and "ws" in df.columns:
+        df["ws_kt"] = df["ws"] * MS_TO_KT
+    # urutkan sekali di sini (ikut ter-cache); waktu lokal diutamakan seperti slider.
+    # BMKG umumnya sudah terurut: cek monoton (satu pass) dulu, sort hanya jika perlu
+    for c in ("local_datetime_dt", "utc_datetime_dt"):
+        if df[c].notna().any():
+            if not df[c].is_monotonic_increasing:
+                df = df.sort_values(c, kind="stable", ignore_index=True)
+            break
+    return df
+
+def location_indices(data):
+    # label -> indeks entry untuk SATU payload; indeks hanya sah terhadap list `data` yang sama
+    mapping = {}
+    for i, e in enumerate(data):
+        lok = e.get("lokasi", {})
+        label = lok.get("kotkab") or lok.get("adm2") or f"Location {len(mapping)+1}"
+        mapping[label] = i
+    return mapping
+
+# Mapping label -> indeks entry di raw["data"], dibuat sekali per payload adm1 (hanya int, tanpa referensi entry).
+# cache_data (bukan cache_resource) agar ikut terhapus oleh tombol "Fetch Data" bersama payload-nya
+@st.cache_data(ttl=300, show_spinner=False)
+def location_mapping(adm1: str):
+    return location_indices(fetch_forecast(adm1).get("data", []))
+
+# Hasil flatten + kolom turunan di-cache per (adm1, lokasi) agar rerun dari slider/checkbox tidak menghitung ulang
+@st.cache_data(ttl=300, show_spinner=False)
+def load_location_df(adm1: str, loc_choice: str):
+    # entry dicari per label pada payload yang sama (bukan indeks dari location_mapping, yang punya
+    # siklus cache sendiri dan bisa menunjuk ke urutan payload lama)
+    data = fetch_forecast(adm1).get("data", [])
+    idx = location_indices(data).get(loc_choice)
+    if idx is None:
+        return pd.DataFrame()
+    df = flatten_cuaca_entry(data[idx])
+    if df.empty:
+        return df
+    # field numerik yang tidak dikirim BMKG diisi NaN: kolom turunan & tampilan cukup menampilkan "—"
+    missing = [c for c in NUMERIC_COLS if c not in df.columns]
+    if missing:
+        df = df.assign(**dict.fromkeys(missing, np.nan))
+    # dew point dihitung sekali untuk seluruh kolom (dipakai Key Metrics & QAM)
+    df["dewpt"] = estimate_dewpoint_vec(df["t"].to_numpy(dtype=float), df["hu"].to_numpy(dtype=float))
+    # kolom keputusan (ceiling, kategori terbang, takeoff/landing) juga sekali per fetch;
+    # rerun dari slider/checkbox cukup membaca baris `now`
+    vs = df["vs"].to_numpy(dtype=float)
+    df["ceiling_ft"], df["ceiling_label"] = ceiling_proxy_vec(df["tcc"].to_numpy(dtype=float))
+    df["flight_cat"] = classify_ifr_vfr_vec(vs, df["ceiling_ft"].to_numpy())
+    takeoff, landing = takeoff_landing_codes(df["ws_kt"].to_numpy(dtype=float), vs, df["tp"].to_numpy(dtype=float))
+    df["takeoff_reco"] = RECO_LABEL_ARR[takeoff]
+    df["landing_reco"] = RECO_LABEL_ARR[landing]
+    return df
+
+def _json_default(obj):
+    # Timestamp/NaT pandas -> ISO 8601 / null untuk orjson
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat(timespec="milliseconds")
+    raise TypeError
+
+# Serialisasi export di-cache per isi df_sel: klik ulang pada rentang yang sama tidak menulis ulang CSV/JSON
+# Payload langsung berupa bytes (tanpa str perantara); orjson memang menghasilkan bytes
+@st.cache_data(show_spinner=False)
+def export_csv(df):
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False)
+def export_json(df):
+    # kolom datetime -> string ISO (ms) sekali per kolom secara vektor, bukan _json_default per sel; NaT -> null
+    iso = {}
+    for c in df.select_dtypes("datetime").columns:
+        vals = df[c].to_numpy(dtype="datetime64[ms]")
+        iso[c] = np.where(np.isnat(vals), None, np.datetime_as_string(vals, unit="ms"))
+    records = df.assign(**iso).to_dict(orient="records")
+    return orjson.dumps(records, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+@st.cache_data(show_spinner=False)
+def export_parquet(df):
+    # kolumnar + zstd: file jauh lebih kecil & cepat dibaca ulang ke pandas/Arrow (pyarrow ikut terpasang bersama Streamlit)
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine="pyarrow", compression="zstd", index=False)
+    return buf.getvalue()
+
+# Bagian export sebagai fragment: klik tombol download hanya me-rerun blok ini, bukan seluruh dashboard.
+# Isi file dibuat lazy (callable) saat tombol diklik, bukan di setiap rerun.
+@st.fragment
+def export_section(df_sel, adm1, loc_choice):
+    # satu frame untuk ketiga format: seluruh kolom kecuali kolom bantu (URL ikon, time_index)
+    df_export = df_sel.drop(columns=[c for c in EXPORT_DROP_COLS if c in df_sel.columns])
+    colA, colB, colC = st.columns(3)
+    with colA:
+        st.download_button("⬇ CSV", lambda: export_csv(df_export), file_name=f"{adm1}_{loc_choice}.csv", mime="text/csv")
+    with colB:
+        st.download_button("⬇ JSON", lambda: export_json(df_export), file_name=f"{adm1}_{loc_choice}.json", mime="application/json")
+    with colC:
+        st.download_button("⬇ Parquet", lambda: export_parquet(df_export), file_name=f"{adm1}_{loc_choice}.parquet", mime="application/octet-stream")
+
+def plot_values(series):
+    # float64 -> float32 untuk payload plot (typed array base64 jadi setengah); kolom int sudah diperkecil oleh plotly
+    values = series.to_numpy()
+    return values.astype(np.float32) if values.dtype == np.float64 else values
+
+def trend_figure(panels):
+    # satu figure grid 2 kolom: panel (judul, trace) diisi per kolom, sumbu waktu bersama per kolom
+    rows = (len(panels) + 1) // 2
+    fig = make_subplots(rows=rows, cols=2, shared_xaxes=True, subplot_titles=[title for title, _ in panels])
+    for i, (_, trace) in enumerate(panels):
+        fig.add_trace(trace, row=i // 2 + 1, col=i % 2 + 1)
+    fig.update_layout(height=350 * rows, showlegend=False)
+    return fig
+
+def estimate_dewpoint_vec(temp, rh):
+    # simple approximation, vektor numpy (NaN pada t/rh otomatis menghasilkan NaN)
+    return temp - ((100 - rh) / 5)
+
+# Lookup table ceiling: batas tcc (%) -> indeks kategori SKC/FEW/SCT/BKN/OVC
+CEIL_TCC_EDGES = np.array([1, 25, 50, 75])
+CEIL_FT = (99999, 3500, 2250, 1250, 800)
+CEIL_LABELS = ("SKC (Clear)", "FEW (>3000 ft)", "SCT (1500-3000 ft)", "BKN (1000-1500 ft)", "OVC (<1000 ft)")
+
+def ceiling_proxy_vec(tcc_pct):
+    # versi vektor: (ceiling ft float, NaN jika tcc kosong; label)
+    tcc = np.asarray(tcc_pct, dtype=float)
+    idx = np.searchsorted(CEIL_TCC_EDGES, tcc, side="right")
+    unknown = np.isnan(tcc)
+    ceil_ft = np.where(unknown, np.nan, np.array(CEIL_FT, dtype=float)[idx])
+    labels = np.where(unknown, "Unknown", np.array(CEIL_LABELS)[idx])
+    return ceil_ft, labels
+
+def convert_vis_to_sm(visibility_m):
+    if pd.isna(visibility_m) or visibility_m is None:
+        return "—"
+    try:
+        vis_m = float(visibility_m)
+        vis_sm = vis_m * METER_TO_SM
+        if vis_sm < 1:
+            return f"{vis_sm:.1f} SM"
+        elif vis_sm < 5:
+            if (vis_sm * 2) % 2 == 0:
+                return f"{int(vis_sm)} SM"
+            else:
+                return f"{vis_sm:.1f} SM"
+        else:
+            return f"{int(round(vis_sm))} SM"
+    except ValueError:
+        return "—"
+
+def classify_ifr_vfr_vec(visibility_m, ceiling_ft):
+    # versi vektor (np.select) — ceiling NaN = ceiling tidak diketahui
+    vis_sm = np.asarray(visibility_m, dtype=float) / 1609.34
+    ceil = np.asarray(ceiling_ft, dtype=float)
+    no_ceil = np.isnan(ceil)
+    conditions = [
+        np.isnan(vis_sm),
+        no_ceil & (vis_sm >= 3),
+        no_ceil & (vis_sm >= 1),
+        no_ceil,
+        (vis_sm >= 5) & (ceil > 3000),
+        ((3 <= vis_sm) & (vis_sm < 5)) | ((1000 < ceil) & (ceil <= 3000)),
+        (vis_sm < 3) | (ceil <= 1000),
+    ]
+    choices = ["Unknown", "VFR", "MVFR", "IFR", "VFR", "MVFR", "IFR"]
+    return np.select(conditions, choices, default="Unknown")
+
+# Kode keputusan: 0 = Recommended, 1 = Caution, 2 = Not Recommended
+RECO_LABELS = ("Recommended", "Caution", "Not Recommended")
+RECO_LABEL_ARR = np.array(RECO_LABELS)
+
+def takeoff_landing_codes(ws_kt, vs_m, tp_mm):
+    # versi vektor aturan takeoff/landing (NaN tidak memicu aturan apa pun)
+    ws = np.asarray(ws_kt, dtype=float)
+    vs = np.asarray(vs_m, dtype=float)
+    tp = np.asarray(tp_mm, dtype=float)
+    heavy_rain = tp >= 20  # hujan lebat menimpa status lain menjadi Caution
+    takeoff = np.where(heavy_rain, 1, np.where(ws >= 30, 2, 0))
+    landing = np.where(heavy_rain, 1, np.where((ws >= 30) | (vs < 1000), 2, 0))
+    return takeoff, landing
+
+def takeoff_landing_rationale(ws_kt, vs_m, tp_mm):
+    # status takeoff/landing sudah jadi kolom; di sini hanya teks alasan untuk baris `now`
+    rationale = []
+    if pd.notna(ws_kt) and float(ws_kt) >= 30:
+        rationale.append(f"High surface wind: {ws_kt:.1f} KT (>=30 KT limit)")
+    elif pd.notna(ws_kt) and float(ws_kt) >= 20:
+        rationale.append(f"Strong wind: {ws_kt:.1f} KT (>=20 KT advisory)")
+    if pd.notna(vs_m) and float(vs_m) < 1000:
+        rationale.append(f"Low visibility: {vs_m} m (<1000 m)")
+    if pd.notna(tp_mm) and float(tp_mm) >= 20:
+        rationale.append(f"Heavy accumulated rain: {tp_mm} mm (runway contamination possible)")
+    elif pd.notna(tp_mm) and float(tp_mm) > 5:
+        rationale.append(f"Moderate rainfall: {tp_mm} mm")
+    if not rationale:
+        rationale.append("Conditions within conservative operational limits.")
+    return rationale
+
+# Visual badge helper (lookup table status -> HTML badge)
+BADGE_OK = "<span class='badge-green'>OK</span>"
+BADGE_CAUTION = "<span class='badge-yellow'>CAUTION</span>"
+BADGE_NOGO = "<span class='badge-red'>NO-GO</span>"
+BADGE_UNKNOWN = "<span class='badge-yellow'>UNKNOWN</span>"
+BADGE_HTML = {
+    "VFR": BADGE_OK, "Recommended": BADGE_OK, "SKC (Clear)": BADGE_OK,
+    "MVFR": BADGE_CAUTION, "Caution": BADGE_CAUTION,
+    "IFR": BADGE_NOGO, "Not Recommended": BADGE_NOGO,
+}
+
+def badge_html(status):
+    return BADGE_HTML.get(status, BADGE_UNKNOWN)
+
+# Sel metrik (label / nilai / catatan) sebagai potongan HTML untuk grid kartu
+def metric_cell(label, value, note=None, value_class="metric-value", value_style=""):
+    # value/note memuat teks API (weather_desc, vs_text, provinsi, kotkab, ...): di-escape seperti di QAM
+    style = f" style='{value_style}'" if value_style else ""
+    note_html = f"<div class='small-note'>{html.escape(str(note))}</div>" if note is not None else ""
+    return f"<div class='metric-cell'><div class='metric-label'>{label}</div><div class='{value_class}'{style}>{html.escape(str(value))}</div>{note_html}</div>"
+
+# =====================================
+# 🎚️ SIDEBAR (SEBELUM DATA DIMUAT)
+# =====================================
+with st.sidebar:
+    st.title("🛰️ Tactical Controls")
+    adm1 = st.text_input("Province Code (ADM1)", value="32").strip()
+    # Tambahkan input ICAO Code
+    icao_code = st.text_input("ICAO Code (WXXX)", value="WXXX", max_chars=4)
+    st.markdown("<div class='radar'></div>", unsafe_allow_html=True)
+    st.markdown("<p style='text-align:center; color:#5f5;'>Scanning Weather...</p>", unsafe_allow_html=True)
+    # paksa ambil ulang: buang cache in-memory (payload, mapping lokasi, frame) — fetch berikutnya tetap GET bersyarat ke salinan disk
+    if st.button("🔄 Fetch Data"):
+        st.cache_data.clear()
+    st.markdown("---")
+    # Kontrol Tampilan
+    # show_metar (FCST Style Report) telah dihapus
+    show_map = st.checkbox("Show Map", value=True)
+    show_table = st.checkbox("Show Table (Forecast Data)", value=False)
+    # Kontrol baru untuk MET Report
+    show_qam_report = st.checkbox("Show MET Report (QAM)", value=True) # Set to True as preferred
+    st.markdown("---")
+    st.caption("Data Source: BMKG API · Military Ops v2.2")
+
+# =====================================
+# 📡 LOAD DATA
+# =====================================
+st.title("Tactical Weather Operations Dashboard")
+source_note = st.empty()
+source_note.markdown("*Source: BMKG Forecast API — Live Data*")
+
+# BLOK TRY DIMULAI DI SINI
+try:
+    if not ADM1_PATTERN.fullmatch(adm1):
+        st.error("Invalid Province Code (ADM1): use the numeric BMKG code, e.g. 32 or 32.01.")
+        st.stop()
+
+    with st.spinner("🛰️ Acquiring weather intelligence..."):
+        raw = fetch_forecast(adm1)
+
+    stale_since = raw.get(FORECAST_STALE_KEY)
+    if stale_since:
+        # BMKG tidak terjangkau: data berasal dari salinan disk, bukan live
+        source_note.markdown("*Source: BMKG Forecast API — Cached Copy (API unavailable)*")
+        st.warning(
+            f"⚠️ BMKG API unavailable — showing the last cached forecast, confirmed "
+            f"{forecast_age_hours(stale_since):.1f} h ago ({stale_since[:16].replace('T', ' ')} UTC). "
+            "Verify with a live source before operational decisions."
+        )
+
+    entries = raw.get("data", [])
+    if not entries:
+        st.warning("No forecast data available.")
+        st.stop()
+
+    mapping = location_mapping(adm1)
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        loc_choice = st.selectbox("🎯 Select Location", options=list(mapping.keys()))
+    with col2:
+        st.metric("📍 Locations", len(mapping))
+
+    df = load_location_df(adm1, loc_choice)
+
+    if df.empty:
+        st.warning("No valid weather data found.")
+        st.stop()
+
+
+# =====================================
+# 🕓 SLIDER WAKTU
+# =====================================
+    # Find the correct datetime column and set range
+    # (df ter-cache sudah diurutkan di flatten_cuaca_entry; baris NaT di akhir, jadi tidak diurutkan ulang di sini)
+    if "local_datetime_dt" in df.columns and df["local_datetime_dt"].notna().any():
+        min_dt = df["local_datetime_dt"].dropna().min().to_pydatetime()
+        max_dt = df["local_datetime_dt"].dropna().max().to_pydatetime()
+        use_col = "local_datetime_dt"
+    elif "utc_datetime_dt" in df.columns and df["utc_datetime_dt"].notna().any():
+        min_dt = df["utc_datetime_dt"].dropna().min().to_pydatetime()
+        max_dt = df["utc_datetime_dt"].dropna().max().to_pydatetime()
+        use_col = "utc_datetime_dt"
+    else:
+        min_dt = 0
+        max_dt = len(df)-1
+        use_col = None
+
+    # slider only when datetime exists; satu timestamp saja (min == max) -> tanpa slider, pakai df apa adanya
+    if use_col and min_dt != max_dt:
+        # Memindahkan slider ke Sidebar
+        with st.sidebar:
+            start_dt = st.slider(
+                "Time Range",
+                min_value=min_dt,
+                max_value=max_dt,
+                # Set default range to cover only the first forecast time
+                value=(min_dt, min_dt + pd.Timedelta(hours=3)) if len(df) > 1 else (min_dt, max_dt),
+                step=pd.Timedelta(hours=3),
+                format="HH:mm, MMM DD"
+            )
+        # df sudah terurut: batas rentang lewat binary search, slice iloc tanpa copy
+        ts = df[use_col].to_numpy()
+        lo = np.searchsorted(ts, np.datetime64(start_dt[0]), side="left")
+        hi = np.searchsorted(ts, np.datetime64(start_dt[1]), side="right")
+        df_sel = df.iloc[lo:hi]
+    else:
+        df_sel = df
+
+    if df_sel.empty:
+        st.warning("No data in selected time range.")
+        st.stop()
+        
+    # baris pertama sebagai dict biasa: semua now.get(...) di bawah jadi lookup dict, bukan indexer Series.
+    # Nilai kosong (NaN/NaT, termasuk kolom yang diisi NaN karena tidak dikirim BMKG) dibuang agar
+    # now.get(k, '—') menampilkan "—", bukan "nan"
+    now = {k: v for k, v in df_sel.iloc[0].to_dict().items() if pd.notna(v)}
+
+    # prepare MET REPORT values (diperlukan untuk bagian di bawah dan QAM)
+    dewpt = now.get("dewpt")
+    dewpt_disp = f"{dewpt:.1f}°C" if pd.notna(dewpt) else "—"
+    ceiling_est_ft = int(now["ceiling_ft"]) if pd.notna(now.get("ceiling_ft")) else None
+    ceiling_label = now.get("ceiling_label", "Unknown")
+    ceiling_display = f"{ceiling_est_ft} ft" if ceiling_est_ft is not None and ceiling_est_ft <= 99999 else "—"
+    
+    # NEW: Konversi Visibilitas ke Statute Miles
+    vis_sm_disp = convert_vis_to_sm(now.get('vs'))
+
+    
+# =====================================
+# ✈ FLIGHT WEATHER STATUS (KEY METRICS)
+# =====================================
+    st.markdown("---") # Garis pemisah sebelum Key Metrics
+    # satu blok HTML untuk seluruh kartu (bukan 4 kolom x 3 st.markdown)
+    key_cells = "".join((
+        metric_cell("Temperature (°C)", now.get('t','—'), "Ambient"),
+        metric_cell("Wind Speed (KT)", fmt_1f(now.get('ws_kt')), f"{now.get('wd_deg','—')}°"),
+        metric_cell("Visibility (M/SM)", now.get('vs','—'), f"({vis_sm_disp}) / {now.get('vs_text','—')}"),
+        metric_cell("Weather", now.get('weather_desc','—'), f"Rain: {fmt_1f(now.get('tp'))} mm (Accum.)"),
+    ))
+    st.markdown(
+        f"<div class='flight-card'><div class='flight-title'>✈ Key Meteorological Status</div>"
+        f"<div class='metric-grid'>{key_cells}</div></div>",
+        unsafe_allow_html=True,
+    )
+
+
+    # -----------------------------
+    # INSERT HUD (MODE B) — PANEL
+    # -----------------------------
+    # Render HUD wrapper with data-mode attribute so CSS picks Day/Night
+    hud_wrapper_open = f"<div id='f16hud-wrapper' data-mode='{CURRENT_MODE}'>"
+    st.markdown(hud_wrapper_open, unsafe_allow_html=True)
+    st.markdown("<div id='f16hud-container'>", unsafe_allow_html=True)
+    st.markdown("<div id='f16hud-title'>F-16 TACTICAL HUD OVERLAY — PANEL (Mode B)</div>", unsafe_allow_html=True)
+
+    # dynamic HUD variables (safe)
+    _wdir = safe_int(now.get("wd_deg"), default=0)
+    _wspd = safe_float(now.get("ws_kt"), default=0.0)
+    _vis = safe_int(now.get("vs"), default=0)
+    _ceil = safe_int(ceiling_est_ft, default=0)
+
+    # limit wind arrow length so it fits nicely
+    max_arrow_len = 120
+    arrow_len = min(max_arrow_len, int(_wspd * 3))  # scaling factor for visibility in HUD
+
+    # Compute end point of arrow relative to center (400,150) used below
+    # satu konversi derajat->radian; fungsi math untuk skalar (tanpa overhead ufunc numpy)
+    wd_rad = math.radians(_wdir)
+    dx = math.sin(wd_rad) * arrow_len
+    dy = -math.cos(wd_rad) * arrow_len  # negative because SVG Y increases downward
+
+    hud_svg = HUD_SVG_TEMPLATE.substitute(
+        hdg=f"{_wdir:03d}",
+        wdir=_wdir,
+        wspd=f"{_wspd:.1f}",
+        tip_x=f"{400 + dx:.1f}",
+        tip_y=f"{150 + dy:.1f}",
+        left_x=f"{400 + dx - 6:.1f}",
+        right_x=f"{400 + dx + 6:.1f}",
+        back_y=f"{150 + dy - 6:.1f}",
+        vis=_vis,
+        vis_sm=convert_vis_to_sm(_vis),
+        ceil=_ceil,
+    )
+
+    st.markdown(hud_svg, unsafe_allow_html=True)
+    st.markdown("</div>", unsafe_allow_html=True)  # close container
+    st.markdown("</div>", unsafe_allow_html=True)  # close wrapper
+
+# =====================================
+# ☁ METEOROLOGICAL DETAILS (SECONDARY) - REVISI
+# =====================================
+    # satu blok HTML: dua seksi berdampingan, masing-masing grid 2 kolom
+    small_value = "font-size: 1.0rem;"
+    atmos_cells = "".join((
+        metric_cell("Air Temperature (°C)", f"{now.get('t','—')}°C", value_class="detail-value"),
+        metric_cell("Dew Point (Est)", dewpt_disp, value_class="detail-value"),
+        metric_cell("Relative Humidity (%)", f"{now.get('hu','—')}%", value_class="detail-value"),
+        metric_cell("Wind Direction (Code)", f"{now.get('wd','—')} ({now.get('wd_deg','—')}°)", value_class="detail-value"),
+        metric_cell("Province", now.get('provinsi','—'), value_class="detail-value", value_style=small_value),
+        metric_cell("City/Regency", now.get('kotkab','—'), value_class="detail-value", value_style=small_value),
+    ))
+    sky_cells = "".join((
+        metric_cell("Visibility (Metres/SM)", f"{now.get('vs','—')} m", f"({vis_sm_disp}) / {now.get('vs_text','—')}", value_class="detail-value"),
+        metric_cell("Est. Ceiling Base", ceiling_display, f"({ceiling_label.split('(')[0].strip()})", value_class="detail-value"),
+        metric_cell("Cloud Cover (%)", f"{now.get('tcc','—')}%", value_class="detail-value"),
+        metric_cell("Present Weather", f"{now.get('weather_desc','—')} ({now.get('weather','—')})", value_class="detail-value"),
+        metric_cell("Local Forecast Time", now.get('local_datetime','—'), value_class="detail-value", value_style=small_value),
+        metric_cell("Analysis Time (UTC)", now.get('analysis_date','—'), value_class="detail-value", value_style=small_value),
+    ))
+    st.markdown(
+        f"<div class='flight-card'><div class='flight-title'>☁ Meteorological Details</div>"
+        f"<div class='metric-grid cols-2'>"
+        f"<div><h5>🌡️ Atmospheric State</h5><div class='metric-grid cols-2'>{atmos_cells}</div></div>"
+        f"<div><h5>🌁 Sky and Visibility</h5><div class='metric-grid cols-2'>{sky_cells}</div></div>"
+        f"</div></div>",
+        unsafe_allow_html=True,
+    )
+
+# =====================================
+# === MET REPORT (QAM REPLICATION) - DIPINDAHKAN KE SIDEBAR
+# =====================================
+
+    if show_qam_report:
+        # prepare MET REPORT values
+        visibility_m = now.get('vs', '—')
+        wind_info = f"{now.get('wd_deg','—')}° / {fmt_1f(now.get('ws_kt'))} KT"
+        wind_variation = "Not available (BMKG Forecast)"  
+        ceiling_full_desc = f"Est. Base: {ceiling_est_ft} ft ({ceiling_label.split('(')[0].strip()})" if ceiling_est_ft is not None and ceiling_est_ft <= 99999 else "—"
+
+
+        # 📌 START: MEMBANGUN HTML UNTUK LAPORAN QAM
+        qam_fields = {k: now.get(k, '—') for k in QAM_NOW_FIELDS}
+        qam_fields.update(
+            icao_code=icao_code,
+            wind_info=wind_info,
+            wind_variation=wind_variation,
+            visibility_m=visibility_m,
+            vis_sm_disp=vis_sm_disp,
+            tp=fmt_1f(now.get('tp')),
+            ceiling_full_desc=ceiling_full_desc,
+            dewpt_disp=dewpt_disp,
+        )
+        # escape sekali per field (weather_desc dkk. dari API tidak dijamin bebas HTML)
+        met_report_html_content = QAM_TEMPLATE.substitute({k: html.escape(str(v)) for k, v in qam_fields.items()})
+        # 📌 END: MEMBANGUN HTML UNTUK LAPORAN QAM
+
+        # Menggabungkan CSS dan konten HTML untuk file yang diunduh
+        full_qam_html = f"<html><head>{CSS_STYLES}</head><body>{met_report_html_content}</body></html>"
+
+        st.markdown("---")
+        st.subheader("📝 Meteorological Report (QAM/Form Replication)")
+        st.markdown(met_report_html_content, unsafe_allow_html=True)
+        
+        # Implementasi tombol Download QAM
+        qam_filename = f"MET_REPORT_{loc_choice}_{now.get('local_datetime','—').replace(' ', '_').replace(':','')}.html"
+        st.download_button(
+            label="⬇ Download QAM Report (HTML)",
+            data=full_qam_html,
+            file_name=qam_filename,
+            mime="text/html",
+            help="Unduh laporan QAM sebagai file HTML. Buka di browser dan gunakan fungsi 'Cetak ke PDF' untuk konversi formal."
+        )
+        st.markdown("---")
+
+# =====================================
+# === DECISION MATRIX (KRUSIAL)
+# =====================================
+    ifr_vfr = now.get("flight_cat", "Unknown")
+    takeoff_reco, landing_reco = now.get("takeoff_reco", "Unknown"), now.get("landing_reco", "Unknown")
+    reco_rationale = takeoff_landing_rationale(now.get("ws_kt"), now.get("vs"), now.get("tp"))
+
+    st.markdown("---")
+    st.subheader("🔴 Operational Decision Matrix")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("**Regulatory Category**")
+        ifr_badge = badge_html(ifr_vfr)
+        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{ifr_badge}  <strong style='margin-left:8px;'>{ifr_vfr}</strong></div>", unsafe_allow_html=True)
+    with col2:
+        st.markdown("**Takeoff Recommendation**")
+        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{badge_html(takeoff_reco)}  <strong style='margin-left:8px;'>{takeoff_reco}</strong></div>", unsafe_allow_html=True)
+    with col3:
+        st.markdown("**Landing Recommendation**")
+        st.markdown(f"<div style='padding:8px; border-radius:8px; background:#081108'>{badge_html(landing_reco)}  <strong style='margin-left:8px;'>{landing_reco}</strong></div>", unsafe_allow_html=True)
+
+    # Rationale / Notes
+    st.markdown("**Rationale / Notes:**")
+    st.markdown("\n".join(f"- {r}" for r in reco_rationale))
+    st.markdown("---")
+
+# =====================================
+# 📈 TRENDS
+# =====================================
+    st.subheader("📊 Parameter Trends")
+    if len(df_sel) < MIN_TREND_POINTS:
+        # satu titik tidak membentuk garis: lewati pembuatan figure sama sekali
+        st.info("Widen the time range to plot parameter trends.")
+    else:
+        # go + numpy langsung (tanpa inferensi DataFrame plotly.express); Scattergl = render WebGL
+        x_time = df_sel["local_datetime_dt"].to_numpy()
+        # keempat parameter dalam satu figure subplot 2x2 (satu payload plotly_chart)
+        st.plotly_chart(trend_figure((
+            ("Temperature", go.Scattergl(x=x_time, y=plot_values(df_sel["t"]), mode="lines")),
+            ("Wind (KT)", go.Scattergl(x=x_time, y=plot_values(df_sel["ws_kt"]), mode="lines")),
+            ("Humidity", go.Scattergl(x=x_time, y=plot_values(df_sel["hu"]), mode="lines")),
+            ("Rainfall", go.Bar(x=x_time, y=plot_values(df_sel["tp"]))),
+        )), use_container_width=True)
+
+# =====================================
+# 🌪️ WINDROSE (ASLI)
+# =====================================
+    st.markdown("---")
+    st.subheader("🌪️ Windrose — Direction & Speed")
+    if "wd_deg" in df_sel.columns and "ws_kt" in df_sel.columns:
+        # filter NaN langsung di array numpy (tanpa salinan DataFrame lewat dropna)
+        wd_vals = df_sel["wd_deg"].to_numpy(dtype=float)
+        ws_vals = df_sel["ws_kt"].to_numpy(dtype=float)
+        valid = ~(np.isnan(wd_vals) | np.isnan(ws_vals))
+        wd_vals, ws_vals = wd_vals[valid], ws_vals[valid]
+        if ws_vals.size:
+            # Binning integer via searchsorted (interval kanan-tertutup seperti pd.cut, tanpa Categorical)
+            # Sektor 16 (348.75°–360°) dilipat kembali ke N
+            dir_idx = (np.searchsorted(WINDROSE_DIR_BINS, wd_vals % 360) - 1) % 16
+            speed_idx = np.maximum(np.searchsorted(WINDROSE_SPEED_BINS, ws_vals) - 1, 0)  # include_lowest
+            in_range = ws_vals <= WINDROSE_SPEED_BINS[-1]
+
+            # histogram 2D 16x6 lewat satu bincount pada indeks gabungan (sektor, kelas kecepatan)
+            n_speed = len(WINDROSE_SPEED_LABELS)
+            flat_idx = dir_idx[in_range] * n_speed + speed_idx[in_range]
+            counts = np.bincount(flat_idx, minlength=16 * n_speed).reshape(16, n_speed)
+            percent = counts / counts.sum() * 100
+            # semua trace dibuat sekaligus dari kolom matriks persen (tanpa filter per kelas);
+            # dict biasa -> divalidasi sekali oleh go.Figure, tanpa objek go.Barpolar perantara
+            fig_wr = go.Figure(data=[
+                dict(
+                    type="barpolar", r=percent[:, i].astype(np.float32), theta=WINDROSE_THETA,
+                    name=f"{sc} KT", marker_color=WINDROSE_COLORS[i], opacity=0.85
+                )
+                for i, sc in enumerate(WINDROSE_SPEED_LABELS)
+            ], layout=WINDROSE_LAYOUT)
+            st.plotly_chart(fig_wr, use_container_width=True)
+        else:
+            st.info("Insufficient wind data for Windrose plot.")
+    else:
+        st.info("Wind data (wd_deg, ws_kt) not available in dataset for windrose.")
+
+# =====================================
+# 🗺️ MAP
+# =====================================
+    if show_map:
+        st.markdown("---")
+        st.subheader("🗺️ Tactical Map")
+        try:
+            # lat/lon lokasi sudah ada di frame ter-cache (dikoersi numerik lewat NUMERIC_COLS): cukup ambil satu baris
+            st.map(df[["lat", "lon"]].iloc[:1].fillna(0), latitude="lat", longitude="lon")
+        except Exception as e:
+            st.warning(f"Map unavailable: {e}")
+
+# =====================================
+# 📋 TABLE
+# =====================================
+    if show_table:
+        st.markdown("---")
+        st.subheader("📋 Forecast Table")
+        # hanya kolom forecast/keputusan yang dikirim ke browser (tanpa URL ikon, string waktu mentah,
+        # kolom lokasi konstan); index RangeIndex hasil slice tidak informatif, jadi disembunyikan
+        st.dataframe(df_sel[[c for c in TABLE_COLS if c in df_sel.columns]], hide_index=True)
+
+# =====================================
+# 💾 EXPORT
+# =====================================
+    st.markdown("---")
+    st.subheader("💾 Export Data")
+    # Tombol download QAM sudah dipindahkan ke dalam blok show_qam_report di atas.
+    export_section(df_sel, adm1, loc_choice)
+
+
+# BLOK EXCEPT DIMULAI DI SINI UNTUK MENUTUP BLOK TRY
+except requests.exceptions.HTTPError as e:
+    st.error(f"API Error: Could not fetch data. Check Province Code (ADM1). Status code: {e.response.status_code}")
+except requests.exceptions.ConnectionError:
+    st.error("Connection Error: Could not connect to BMKG API.")
+except requests.exceptions.RequestException as e:
+    # hanya gangguan jaringan (timeout dll.) yang ditangkap di sini; error render lain dibiarkan
+    # naik ke handler Streamlit agar traceback-nya terlihat, bukan diringkas jadi st.error
+    st.error(f"Network Error: Could not fetch data from BMKG API ({e.__class__.__name__}).")
+except orjson.JSONDecodeError:
+    # body BMKG (mis. halaman maintenance HTML dengan status 200) atau salinan disk bukan JSON yang valid
+    st.error("Data Error: BMKG API returned an invalid (non-JSON) response. Try again later.")
+
+# =====================================
+# ⚓ FOOTER
+# =====================================
+# HTML statis langsung lewat st.html (tanpa pipeline markdown)
+st.divider()
+st.html(FOOTER_HTML)
@@ -0,0 +1,64 @@
+"""Render app.py headless (Streamlit AppTest) against a mocked BMKG payload."""
+import re
+from pathlib import Path
+from unittest import mock
+
+import orjson
+import pytest
+import requests
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+def make_payload(n_rows=5, drop=(), nan=()):
+    cuaca = []
+    for k in range(n_rows):
+        obs = {
+            "t": 28, "tcc": 60, "tp": 1.5, "weather": 3, "weather_desc": "Berawan",
+            "wd_deg": 90, "wd": "E", "ws": 5.0, "hu": 80, "vs": 6000, "vs_text": "> 10 km",
+            "analysis_date": "2025-01-01T00:00:00",
+            "utc_datetime": f"2025-01-01 {3 * k:02d}:00:00",
+            "local_datetime": f"2025-01-01 {3 * k + 7:02d}:00:00",
+        }
+        for c in drop:
+            obs.pop(c, None)
+        obs.update(dict.fromkeys(nan))
+        cuaca.append(obs)
+    lokasi = {"adm1": "14", "adm2": "14.71", "provinsi": "Riau", "kotkab": "Kota Pekanbaru", "lat": 0.5, "lon": 101.4}
+    return {"data": [{"lokasi": lokasi, "cuaca": [cuaca]}]}
+
+
+def render(payload):
+    class Resp:
+        status_code = 200
+        headers = {}
+        content = orjson.dumps(payload)
+
+        def raise_for_status(self):
+            pass
+
+    st.cache_data.clear()
+    with mock.patch.object(requests.Session, "get", lambda self, *a, **k: Resp()):
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.run()
+    return at
+
+
+@pytest.mark.parametrize("kwargs", [dict(drop=("vs",)), dict(nan=("vs",)), dict(drop=("vs", "tcc", "t", "hu"))])
+def test_missing_fields_render_placeholder(kwargs):
+    at = render(make_payload(**kwargs))
+    assert not at.exception
+    text = "\n".join(m.value for m in at.markdown)
+    assert "Meteorological Report" in "\n".join(h.value for h in at.subheader)  # QAM tampil (default)
+    assert not re.search(r"\bNone\b", text)
+    assert not re.search(r"\bnan\b", text)
+
+
+def test_single_timestamp_skips_slider():
+    # semua baris satu timestamp (min_dt == max_dt): tanpa slider, tidak error
+    at = render(make_payload(n_rows=1))
+    assert not at.exception
+    assert not at.slider
+    assert "Meteorological Report" in "\n".join(h.value for h in at.subheader)